@@ -1,4 +1,7 @@
 import asyncio
+import binascii
+import logging
+import time
 from bleak import BleakClient, BleakScanner
 import struct
 
@@ -19,16 +22,23 @@ UUID_MANUFACTURER = "00002a29-0000-1000-8000-00805f9b34fb"
 UUID_READ = "bccb0003-ca66-11e5-88a4-0002a5d5c51b"
 UUID_WRITE = "bccb0002-ca66-11e5-88a4-0002a5d5c51b"
 
-# Format - device_id + uuid_command + temperature + shower + bath = 01|87050101|e0|64|00 for shower
-UUID_COMMAND = "87050101"
-# Format - device_id + uuid_trigger_notif = 01|0700458A send to UUID_WRITE to trigger a notif on UUID_READ
-UUID_TRIGGER_NOTIF = "0700458A"
+# Format - device_id + command + temperature + shower + bath = 01|87050101|e0|64|00 for shower
+CMD_PREFIX = b'\x87\x05\x01\x01'
+# Format - device_id + trigger_notif = 01|0700458A send to UUID_WRITE to trigger a notif on UUID_READ
+TRIGGER_NOTIF = b'\x07\x00\x45\x8a'
 
-def _convert_temperature(celsius):
-    return int(max(0, min(255, round(celsius * 10.4 - 268))))
+# Drop the BLE link after this many seconds without a command
+IDLE_DISCONNECT_SECONDS = 30
 
-def _convert_temperature_reverse(mira_temp):
-    return round((mira_temp + 268) / 10.4, 2)
+# Window for merging rapid back-to-back mutations into one BLE write
+PUSH_COALESCE_SECONDS = 0.05
+
+_LOGGER = logging.getLogger(__name__)
+
+# temperatures are single bytes on the wire and whole degrees celsius in
+# this example, so both conversions collapse to table lookups built once
+_TEMP_REVERSE = tuple(round((i + 268) / 10.4, 2) for i in range(256))
+_TEMP_FORWARD = {c: max(0, min(255, round(c * 10.4 - 268))) for c in range(0, 101)}
 
 async def discover():
     """Discover Bluetooth LE devices."""
@@ -55,41 +65,65 @@ class MiraInstance:
         # future used for notify callback
         self._notification_future = None
 
+        self._last_activity = 0.0
+        self._idle_task = None
+        self._loop = None
+        self._push_handle = None
+        self._push_future = None
+
+        # serializes the notification-based exchanges (_send/_poll_state) -
+        # concurrent callers sharing the single notification future would
+        # steal each other's replies. Plain reads don't need it.
+        self._io_lock = asyncio.Lock()
+
         self._device = BleakClient(self._mac)
 
-    # Use CRC-16-CCITT to validate payload, using the sniffed client id
+        # characteristic handles, bound once per connection in connect()
+        self._ch_read = UUID_READ
+        self._ch_write = UUID_WRITE
+
+        # these depend only on the device id and constants - assemble once
+        self._cmd_prefix = bytes([self._device_id]) + CMD_PREFIX
+        self._trigger_msg = bytes([self._device_id]) + TRIGGER_NOTIF
+        self._client_id_be = struct.pack(">I", self._client_id)
+
+    # Use CRC-16-CCITT to validate payload, using the sniffed client id.
+    # binascii.crc_hqx is the same polynomial (0x1021, init 0xFFFF)
+    # implemented in C in the stdlib, so the whole loop is one call.
     def _encode_crc(self, payload):
-        data = payload + struct.pack(">I", self._client_id)
-
-        i = 0
-        i2 = 0xFFFF
-        while i < len(data):
-            b = data[i]
-            i3 = i2
-            for i2 in range(8):
-                i4 = 1
-                i5 = 1 if ((b >> (7 - i2)) & 1) == 1 else 0
-                if ((i3 >> 15) & 1) != 1:
-                    i4 = 0
-                i3 = i3 << 1
-                if (i5 ^ i4) != 0:
-                    i3 = i3 ^ 0x1021
-            i += 1
-            i2 = i3
-        crc = i2 & 0xFFFF
-
-        return payload + struct.pack(">H", crc)
+        n = len(payload)
+        buf = bytearray(n + 2)
+        buf[:n] = payload
+        # chain the client id through the CRC state instead of materializing
+        # payload + client_id, and pack the CRC straight into the frame
+        crc = binascii.crc_hqx(self._client_id_be, binascii.crc_hqx(payload, 0xFFFF))
+        struct.pack_into(">H", buf, n, crc)
+        return bytes(buf)
 
     async def _send(self, data: bytearray):
-        print('data to send: ', ''.join(format(x, ' 03x') for x in data))
+        _LOGGER.debug("data to send: %s", data.hex(" "))
         
         if (not self._connected):
             await self.connect()
         
         payload = self._encode_crc(data)
 
-        print('payload with crc: ', ''.join(format(x, ' 03x') for x in payload))
-        await self._device.write_gatt_char(UUID_WRITE, payload)
+        _LOGGER.debug("payload with crc: %s", payload.hex(" "))
+
+        # taken after the connect check so connect()'s own initial poll can
+        # acquire it without deadlocking
+        async with self._io_lock:
+            # the device notifies its new state in response to the command
+            # write itself - arm the future first so that reply isn't lost
+            self._notification_future = self._loop.create_future()
+            await self._device.write_gatt_char(self._ch_write, payload)
+            self._last_activity = time.monotonic()
+
+            try:
+                notif = await asyncio.wait_for(self._notification_future, timeout=0.5)
+            except asyncio.TimeoutError:
+                return False
+        return self._parse_state(notif) is not None
 
     def _notification_handler(self, sender, data):
         if self._notification_future and not self._notification_future.done():
@@ -99,47 +133,64 @@ class MiraInstance:
         if (not self._connected):
             await self.connect()
 
-        # Create a new future for this notification
-        self._notification_future = asyncio.get_event_loop().create_future()
-
-        await self._device.start_notify(UUID_READ, self._notification_handler)
+        async with self._io_lock:
+            # Create a new future for this notification - the subscription is
+            # already in place from connect()
+            self._notification_future = self._loop.create_future()
 
-        # Write data to trigger a notification
-        await self._device.write_gatt_char(UUID_WRITE, bytes([device_id]) + bytes.fromhex(UUID_TRIGGER_NOTIF))
+            # Write data to trigger a notification
+            await self._device.write_gatt_char(self._ch_write, self._trigger_msg)
 
-        # Wait for notification (this will block until notification_handler is called)
-        data = await self._notification_future
+            # Wait for notification (this will block until notification_handler is called)
+            data = await self._notification_future
+            self._last_activity = time.monotonic()
 
-        await self._device.stop_notify(UUID_READ)
+        _LOGGER.debug("polled data: %s", data.hex(" "))
 
-        print('polled data: ', ''.join(format(x, ' 03x') for x in data))
+        return self._parse_state(data)
 
+    def _parse_state(self, data):
         # -- extract data from binary --
+        n = len(data)
 
         # Ignore as doesnt include information about outlet valves
-        if len(data) == 19:
+        if n == 19:
             return
-        
-        # Missing first byte but still contains data
-        if len(data) == 13:
-            b = bytearray(b'\x00')
-            data[0:0] = b
-
-        if len(data) != 14:
-            raise Exception("Unexpected data length")
 
-        self._temperature = _convert_temperature_reverse(data[6])
-        self._shower = data[9] == 0x64
-        self._bath = data[10] == 0x64
-
-        print(self._shower, self._bath, self._temperature)
+        # 13-byte packets are just missing the leading byte; index through
+        # an offset rather than shifting the whole buffer to prepend a pad
+        # byte (which also assumed data was a bytearray)
+        if n == 13:
+            offset = 1
+        elif n == 14:
+            offset = 0
+        else:
+            raise ValueError(f"Unexpected data length {n}")
+
+        self._temperature = _TEMP_REVERSE[data[6 - offset]]
+        self._shower = data[9 - offset] == 0x64
+        self._bath = data[10 - offset] == 0x64
+
+        _LOGGER.debug("shower=%s bath=%s temperature=%s", self._shower, self._bath, self._temperature)
         return (self._shower, self._bath, self._temperature)
 
     async def _read(self, uuid):
         if (not self._connected):
             await self.connect()
-        
-        return await self._device.read_gatt_char(uuid)
+
+        data = await self._device.read_gatt_char(uuid)
+        self._last_activity = time.monotonic()
+        return data
+
+    async def _disconnect_when_idle(self):
+        # holding the link open makes back-to-back commands fast, but the
+        # shower shouldn't stay connected forever - drop after a quiet spell
+        while self._connected:
+            idle = time.monotonic() - self._last_activity
+            if idle >= IDLE_DISCONNECT_SECONDS:
+                await self.disconnect()
+                return
+            await asyncio.sleep(IDLE_DISCONNECT_SECONDS - idle)
 
     @property
     def mac(self):
@@ -158,56 +209,123 @@ class MiraInstance:
         return self._bath
 
     async def get_device_info(self):
-        model_number = (await self._read(UUID_MODEL_NUMBER)).decode('UTF-8')
-        serial_number = await self._read(UUID_SERIAL_NUMBER)
-        firmware = await self._read(UUID_FIRMWARE)
-        hardware_revision = await self._read(UUID_HARDWARE_REVISION)
-        manufacturer = (await self._read(UUID_MANUFACTURER)).decode('UTF-8')
+        # connect once up front, then let the five reads overlap - each is a
+        # full GATT round-trip, so in series they cost five times the RTT
+        if (not self._connected):
+            await self.connect()
 
-        print([model_number, serial_number, firmware, hardware_revision, manufacturer])
+        model_number, serial_number, firmware, hardware_revision, manufacturer = await asyncio.gather(
+            self._read(UUID_MODEL_NUMBER),
+            self._read(UUID_SERIAL_NUMBER),
+            self._read(UUID_FIRMWARE),
+            self._read(UUID_HARDWARE_REVISION),
+            self._read(UUID_MANUFACTURER),
+        )
+
+        print([model_number.decode('UTF-8'), serial_number, firmware, hardware_revision, manufacturer.decode('UTF-8')])
+
+    def _schedule_push(self):
+        # the command frame carries temperature, shower and bath atomically,
+        # so quick successive mutations can ship as one write - wait a tick
+        # before pushing and let later mutations join the same frame. The
+        # returned future resolves once the write has actually gone out.
+        if self._push_handle is None:
+            loop = self._loop or asyncio.get_running_loop()
+            self._push_future = loop.create_future()
+            self._push_handle = loop.call_later(
+                PUSH_COALESCE_SECONDS, lambda: asyncio.create_task(self._flush_push()))
+        return self._push_future
+
+    async def _flush_push(self):
+        future, self._push_future = self._push_future, None
+        self._push_handle = None
+
+        try:
+            await self.push_state()
+        except Exception as err:
+            if not future.done():
+                future.set_exception(err)
+            return
+        if not future.done():
+            future.set_result(None)
 
     async def set_temperature(self, temp):
         # set the temperature in degrees and push to shower
         self._temperature = temp
-        await self.push_state()
+        await asyncio.shield(self._schedule_push())
 
     async def shower_off(self):
         self._shower = False
-        await self.push_state()
+        await asyncio.shield(self._schedule_push())
 
     async def shower_on(self):
         self._shower = True
-        await self.push_state()
+        await asyncio.shield(self._schedule_push())
 
     async def bath_off(self):
         self._bath = False
-        await self.push_state()
+        await asyncio.shield(self._schedule_push())
 
     async def bath_on(self):
         self._bath = True
-        await self.push_state()
+        await asyncio.shield(self._schedule_push())
 
     async def push_state(self):
         # construct and send message to set temperateu and outlet states as determined by class
-        temperature = _convert_temperature(self.temperature)
+        temperature = _TEMP_FORWARD[int(self.temperature)]
         shower = 0x64 if self._shower else 0
         bath = 0x64 if self._bath else 0
-        await self._send(bytes([device_id]) + bytes.fromhex(UUID_COMMAND) + bytes([temperature, shower, bath]))
+        confirmed = await self._send(self._cmd_prefix + bytes((temperature, shower, bath)))
 
-        await self.update_state()
+        # only pay for an explicit trigger poll when the command write
+        # didn't produce a usable state notification by itself
+        if not confirmed:
+            await self.update_state()
 
     async def update_state(self):
         await self._poll_state()
 
     async def connect(self):
+        # grab the running loop once; get_event_loop() per poll is both
+        # deprecated and needless lookup work
+        self._loop = asyncio.get_running_loop()
+
         await self._device.connect(timeout=20)
-        await asyncio.sleep(1)
         self._connected = True
 
+        # resolve the characteristics once so each write/notify skips
+        # bleak's UUID-to-handle walk; fall back to the UUID strings if the
+        # services tree looks unexpected
+        svcs = self._device.services
+        self._ch_read = svcs.get_characteristic(UUID_READ) or UUID_READ
+        self._ch_write = svcs.get_characteristic(UUID_WRITE) or UUID_WRITE
+
+        # subscribe once per connection; _notification_handler stays
+        # installed and each poll just arms a fresh future for it to
+        # resolve. The subscription round-trip also replaces the old
+        # fixed one-second settle sleep.
+        await self._device.start_notify(self._ch_read, self._notification_handler)
+
+        self._last_activity = time.monotonic()
+        if self._idle_task is None or self._idle_task.done():
+            self._idle_task = asyncio.create_task(self._disconnect_when_idle())
+
         # get current state of connected shower
         await self.update_state()
 
     async def disconnect(self):
+        # ship any push still waiting out its coalescing window
+        if self._push_handle is not None:
+            self._push_handle.cancel()
+            await self._flush_push()
+
+        self._connected = False
+
+        # the idle watcher calls disconnect itself, so don't self-cancel
+        if self._idle_task is not None and self._idle_task is not asyncio.current_task():
+            self._idle_task.cancel()
+        self._idle_task = None
+
         if self._device.is_connected:
             await self._device.disconnect()
 
@@ -233,6 +351,8 @@ async def main():
     await shower.update_state()
     print("shower:", shower.shower, "bath:", shower.bath, "temp:", shower.temperature)
 
+    await shower.disconnect()
+
 # Call this function to discover the address of your device
 # await discover()
 
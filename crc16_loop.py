@@ -6,8 +6,23 @@
 # device id = 0x02
 # client id = 32683 (cracked from packet below)
 
+import os
 import struct
 import binascii
+from multiprocessing import Event, Pool
+
+try:
+    import numpy as np
+except ImportError:
+    # numpy only accelerates the brute-force block search; the algebraic
+    # solver used by __main__ is stdlib-only
+    np = None
+
+try:
+    from numba import njit
+except ImportError:
+    # numba is optional - the NumPy block search below is the fallback
+    njit = None
 
 data = bytearray([
         0x02, 0x87,
@@ -20,39 +35,142 @@ payl = bytearray([
         0x01, 0xE0,
         0x00, 0x64,
         0xD8, 0x5B])
-client = 0x00000000
-
-def _crc(data):
-    i = 0
-    i2 = 0xFFFF
-    while i < len(data):
-        b = data[i]
-        i3 = i2
-        for i2 in range(8):
-            i4 = 1
-            i5 = 1 if ((b >> (7 - i2)) & 1) == 1 else 0
-            if ((i3 >> 15) & 1) != 1:
-                i4 = 0
-            i3 = i3 << 1
-            if (i5 ^ i4) != 0:
-                i3 = i3 ^ 0x1021
-        i += 1
-        i2 = i3
-    return i2 & 0xFFFF
 
+# binascii.crc_hqx is CRC-16/CCITT (poly 0x1021) compiled into CPython -
+# the same win as a hand-built C extension without any build tooling.
+# Pass a previous return value as crc to continue across buffers.
+def _crc(data, crc=0xFFFF):
+    return binascii.crc_hqx(bytes(data), crc)
+
+
+# Compiled once so pack calls skip the format-string parse
+_U32BE = struct.Struct(">I")
+_U16BE = struct.Struct(">H")
 
 def _get_payload_with_crc(payload, client_id):
-    crc = _crc(payload + struct.pack(">I", client_id))
-    print(crc)
-    return payload + struct.pack(">H", crc)
-
-while client < 0xFFFFFFFF:
-	paylg = _get_payload_with_crc(data, client)
-	if paylg == payl:
-		print("Success", client)
-		print(binascii.hexlify(paylg))
-		break
-	else:
-		print("Wrong! ", client)
-		client += 1
-print("End")
+    crc = _crc(payload + _U32BE.pack(client_id))
+    return payload + _U16BE.pack(crc)
+
+# crc_hqx with a zero state maps each byte straight through the CRC table,
+# so this reproduces the standard 256-entry table for the vectorized search
+_CRC_TABLE = None if np is None else \
+    np.array([binascii.crc_hqx(bytes([i]), 0) for i in range(256)],
+             dtype=np.uint32)
+
+# CRC state after the fixed payload bytes - only the 4 client id bytes vary
+_PRESTATE = binascii.crc_hqx(bytes(data), 0xFFFF)
+
+# the CRC bytes of the sniffed packet the candidates must reproduce
+_TARGET_CRC = _U16BE.unpack(payl[8:10])[0]
+
+BLOCK = 1 << 20
+
+if njit is not None:
+    # compiled tight loop: no per-candidate array temporaries at all
+    @njit(cache=True)
+    def _search_block_jit(start, count, table, prestate, target):
+        for i in range(count):
+            client = start + i
+            crc = prestate
+            for shift in (24, 16, 8, 0):
+                b = (client >> shift) & 0xFF
+                crc = ((crc << 8) & 0xFFFF) ^ table[(crc >> 8) ^ b]
+            if crc == target:
+                return client
+        return -1
+
+def _search_block(start, count):
+    if njit is not None:
+        match = _search_block_jit(start, count, _CRC_TABLE, _PRESTATE, _TARGET_CRC)
+        return match if match >= 0 else None
+    if np is None:
+        raise ImportError("the brute-force search needs numpy (or numba)")
+    # fold the four client id byte planes into the CRC state for a whole
+    # block of candidates at once
+    clients = np.arange(count, dtype=np.uint32) + np.uint32(start)
+    crc = np.full(count, _PRESTATE, dtype=np.uint32)
+    for shift in (24, 16, 8, 0):
+        byte = (clients >> np.uint32(shift)) & np.uint32(0xFF)
+        crc = ((crc << np.uint32(8)) & np.uint32(0xFFFF)) \
+            ^ _CRC_TABLE[((crc >> np.uint32(8)) ^ byte) & np.uint32(0xFF)]
+    hits = np.nonzero(crc == _TARGET_CRC)[0]
+    if hits.size:
+        return int(clients[hits[0]])
+    return None
+
+# candidate ranges are independent, so split the search space across cores
+# and stop the siblings via a shared event once one of them hits
+_found = None
+
+def _init_worker(event):
+    global _found
+    _found = event
+
+def _search_range(bounds):
+    lo, hi = bounds
+    client = lo
+    while client < hi:
+        if _found.is_set():
+            return None
+        count = min(BLOCK, hi - client)
+        match = _search_block(client, count)
+        if match is not None:
+            _found.set()
+            return match
+        client += count
+        # progress roughly every 16M candidates; stdout per block would
+        # dominate the runtime
+        if client & 0xFFFFFF == 0:
+            print("progress ", hex(client))
+    return None
+
+def _brute_force():
+    # kept as a cross-check for _solve_client_id
+    workers = os.cpu_count() or 1
+    step = 0x100000000 // workers
+    ranges = [(i * step, 0x100000000 if i == workers - 1 else (i + 1) * step)
+              for i in range(workers)]
+    event = Event()
+    with Pool(workers, initializer=_init_worker, initargs=(event,)) as pool:
+        for match in pool.imap_unordered(_search_range, ranges):
+            if match is not None:
+                return match
+    return None
+
+def _solve_client_id(payload, target_crc):
+    # The CRC is linear over GF(2): each client id bit contributes a fixed
+    # 16-bit vector on top of the CRC of payload + four zero bytes. Build
+    # that 32-column basis and solve for the bits directly - a handful of
+    # XORs instead of a 2^32 search.
+    # CRC state after the fixed payload bytes - each probe only has to
+    # fold its 4-byte suffix from here
+    pre = _crc(payload)
+    crc0 = _crc(b"\x00\x00\x00\x00", pre)
+    basis = {}
+    for bit in range(32):
+        v = _crc((1 << bit).to_bytes(4, "big"), pre) ^ crc0
+        combo = 1 << bit
+        while v:
+            msb = v.bit_length() - 1
+            if msb not in basis:
+                basis[msb] = (v, combo)
+                break
+            bv, bc = basis[msb]
+            v ^= bv
+            combo ^= bc
+    v = target_crc ^ crc0
+    combo = 0
+    while v:
+        msb = v.bit_length() - 1
+        if msb not in basis:
+            raise ValueError("target CRC is not reachable")
+        bv, bc = basis[msb]
+        v ^= bv
+        combo ^= bc
+    return combo
+
+if __name__ == "__main__":
+    match = _solve_client_id(data, _TARGET_CRC)
+    print("Success", match)
+    print(binascii.hexlify(_get_payload_with_crc(data, match)))
+    print("End")
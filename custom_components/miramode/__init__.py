@@ -34,9 +34,17 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if not ble_device:
         raise ConfigEntryNotReady(f"Could not find MiraMode device with address {address}")
 
-    coordinator = MiraModeCoordinator(hass, address, client_id, device_id)
-
-    await coordinator.async_config_entry_first_refresh()
+    # hand the freshly resolved device to the coordinator so the API client
+    # doesn't repeat the registry lookup
+    coordinator = MiraModeCoordinator(hass, address, client_id, device_id, ble_device)
+
+    try:
+        await coordinator.async_config_entry_first_refresh()
+    except ConfigEntryNotReady:
+        # setup will retry with a fresh coordinator - unregister this one's
+        # advertisement callback so retries don't stack up listeners
+        await coordinator.async_shutdown()
+        raise
 
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
@@ -47,5 +55,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator: MiraModeCoordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.async_shutdown()
+        await coordinator.client.async_close()
     return unload_ok
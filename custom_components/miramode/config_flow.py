@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import dataclasses
 import logging
 from typing import Any
@@ -22,7 +23,24 @@ from homeassistant.data_entry_flow import FlowResult
 
 from .const import DOMAIN
 
-_LOGGER = logging.getLogger(__name__)    
+_LOGGER = logging.getLogger(__name__)
+
+# a busy BLE environment can surface many "Mira" devices over repeated
+# renders; keep only the most recently discovered ones
+_MAX_DISCOVERED_DEVICES = 32
+
+# adapters only support a handful of simultaneous connections, so cap
+# how many discovery probes are in flight at once
+_MAX_CONCURRENT_PROBES = 3
+
+# static, so compile the voluptuous validator once at import instead of
+# on every form render
+_DEVICE_DETAILS_SCHEMA = vol.Schema(
+    {
+        vol.Required("device_id"): int,
+        vol.Required("client_id"): int,
+    }
+)
 
 
 class MiraModeConnectionError(Exception):
@@ -38,6 +56,9 @@ class MiraModeConfigFlow(ConfigFlow, domain=DOMAIN):
         """Initialize the config flow."""
         self._discovered_device: BluetoothServiceInfo | None = None
         self._discovered_devices: dict[str, BluetoothServiceInfo] = {}
+        self._discovered_devices_version = 0
+        self._titles: dict[str, str] = {}
+        self._titles_version = -1
         self._pending_entry_title: str | None = None
         self._pending_entry_data: dict | None = None
 
@@ -113,33 +134,53 @@ class MiraModeConfigFlow(ConfigFlow, domain=DOMAIN):
 
         # Discover devices...
         current_addresses = self._async_current_ids()
-        for bt_info in async_discovered_service_info(self.hass):
-            address = bt_info.address
-            if address in current_addresses or address in self._discovered_devices:
-                continue
-            if bt_info.name is None:
-                continue
-            if not bt_info.name.startswith("Mira"):
+        new_infos = [
+            bt_info
+            for bt_info in async_discovered_service_info(self.hass)
+            if bt_info.address not in current_addresses
+            and bt_info.address not in self._discovered_devices
+            and bt_info.name is not None
+            and bt_info.name.startswith("Mira")
+        ]
+
+        # probe the candidates concurrently - serial connects made this step
+        # linear in device count at a few seconds per device
+        sem = asyncio.Semaphore(_MAX_CONCURRENT_PROBES)
+
+        async def _probe(bt_info: BluetoothServiceInfo) -> MiraModeState:
+            async with sem:
+                return await self._check_connection(bt_info)
+
+        results = await asyncio.gather(
+            *(_probe(bt_info) for bt_info in new_infos),
+            return_exceptions=True,
+        )
+        for bt_info, result in zip(new_infos, results):
+            if isinstance(result, Exception):
+                # one unreachable device should not abort the whole flow -
+                # just leave it out of the picker
+                _LOGGER.debug("Skipping %s: %s", bt_info.address, result)
                 continue
-
-            try:
-                await self._check_connection(bt_info)
-            except MiraModeConnectionError:
-                return self.async_abort(reason="cannot_connect")
-            except Exception:
-                return self.async_abort(reason="unknown")
-
-            self._discovered_devices[address] = bt_info
+            self._discovered_devices[bt_info.address] = bt_info
+            self._discovered_devices_version += 1
+            # drop the oldest entries once over the cap (dicts iterate in
+            # insertion order)
+            while len(self._discovered_devices) > _MAX_DISCOVERED_DEVICES:
+                self._discovered_devices.pop(next(iter(self._discovered_devices)))
 
         if not self._discovered_devices:
             return self.async_abort(reason="no_devices_found")
 
-        titles = {
-            address: discovery.name for (address, discovery) in self._discovered_devices.items()
-        }
+        # only rebuild the picker entries when discovery actually changed
+        if self._titles_version != self._discovered_devices_version:
+            self._titles_version = self._discovered_devices_version
+            self._titles = {
+                address: discovery.name
+                for (address, discovery) in self._discovered_devices.items()
+            }
         return self.async_show_form(
             step_id="user",
-            data_schema=vol.Schema({vol.Required(CONF_ADDRESS): vol.In(titles)}),
+            data_schema=vol.Schema({vol.Required(CONF_ADDRESS): vol.In(self._titles)}),
         )
 
     async def async_step_device_details(
@@ -151,10 +192,6 @@ class MiraModeConfigFlow(ConfigFlow, domain=DOMAIN):
             data = {**self._pending_entry_data, **user_input}
             return self.async_create_entry(title=self._pending_entry_title, data=data)
 
-        schema = vol.Schema(
-            {
-                vol.Required("device_id"): int,
-                vol.Required("client_id"): int,
-            }
+        return self.async_show_form(
+            step_id="device_details", data_schema=_DEVICE_DETAILS_SCHEMA
         )
-        return self.async_show_form(step_id="device_details", data_schema=schema)
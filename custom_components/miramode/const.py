@@ -2,4 +2,5 @@
 
 DOMAIN = "miramode"
 
-DEFAULT_SCAN_INTERVAL = 30
+# Safety-net poll when advertisement-driven updates go quiet (seconds)
+FALLBACK_SCAN_INTERVAL = 300
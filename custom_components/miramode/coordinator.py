@@ -1,27 +1,56 @@
+import asyncio
 import logging
 from datetime import timedelta
+from typing import Any
 
+from homeassistant.components import bluetooth
+from homeassistant.components.bluetooth import (
+    BluetoothCallbackMatcher,
+    BluetoothChange,
+    BluetoothScanningMode,
+    BluetoothServiceInfoBleak,
+)
+from homeassistant.core import callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 from .miramode import MiraModeBluetoothAPI, MiraModeState
-from .const import DOMAIN, DEFAULT_SCAN_INTERVAL
+from .const import DOMAIN, FALLBACK_SCAN_INTERVAL
 
 _LOGGER = logging.getLogger(__name__)
 
+# Window for merging rapid-fire entity commands into one BLE write
+DEBOUNCE_WINDOW = 0.1
+
 
 class MiraModeCoordinator(DataUpdateCoordinator[MiraModeState]):
     """DataUpdateCoordinator for Mira Mode device."""
 
-    def __init__(self, hass, address: str, client_id: str, device_id: str) -> None:
+    def __init__(self, hass, address: str, client_id: str, device_id: str, ble_device=None) -> None:
         """Initialize the coordinator."""
         self.hass = hass
-        self._client = MiraModeBluetoothAPI(_LOGGER, hass, address, client_id, device_id)
+        self._client = MiraModeBluetoothAPI(_LOGGER, hass, address, client_id, device_id, ble_device)
 
+        # The device only changes state through our own commands, which push
+        # their updates, so frequent polling mostly read back unchanged data.
+        # Passive advertisements keep the device cache fresh; a slow fallback
+        # poll catches anything missed (e.g. manual use of the shower panel).
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(seconds=DEFAULT_SCAN_INTERVAL),
+            update_interval=timedelta(seconds=FALLBACK_SCAN_INTERVAL),
+        )
+
+        self._update_lock = asyncio.Lock()
+        self._pending_state: dict[str, Any] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flush_future: asyncio.Future[MiraModeState] | None = None
+
+        self._cancel_bluetooth_callback = bluetooth.async_register_callback(
+            hass,
+            self._async_handle_bluetooth_event,
+            BluetoothCallbackMatcher(address=address),
+            BluetoothScanningMode.PASSIVE,
         )
 
     @property
@@ -29,27 +58,79 @@ class MiraModeCoordinator(DataUpdateCoordinator[MiraModeState]):
         """Expose the underlying client for sending commands."""
         return self._client
 
+    @callback
+    def _async_handle_bluetooth_event(
+        self, service_info: BluetoothServiceInfoBleak, change: BluetoothChange
+    ) -> None:
+        """Track advertisements so the device cache stays fresh."""
+        self._client.set_ble_device(service_info.device)
+
+        # only pull state over GATT when we have none yet - commands push
+        # their own updates
+        if self.data is None:
+            self.hass.async_create_task(self.async_request_refresh())
+
+    async def async_shutdown(self) -> None:
+        """Stop listening for advertisements on unload."""
+        # idempotent - this can run both from async_unload_entry and from
+        # HA's automatic coordinator shutdown on entry unload
+        if self._cancel_bluetooth_callback is not None:
+            self._cancel_bluetooth_callback()
+            self._cancel_bluetooth_callback = None
+        await super().async_shutdown()
+
     async def _async_update_data(self) -> MiraModeState:
         """Fetch latest data from Mira Mode device."""
-        return await self._client.update_state()
-        
+        # single-flight: a slow BLE exchange must not pile refreshes up
+        # behind it, so skip instead of queueing
+        if self._update_lock.locked():
+            raise UpdateFailed("previous update still running")
+
+        async with self._update_lock:
+            return await self._client.update_state()
+
+    async def _async_set_value(self, field: str, value: Any) -> MiraModeState:
+        """Queue a state change and flush after a short debounce window.
+
+        Toggling e.g. both valves in quick succession merges into one
+        device write instead of two sequential BLE round-trips.
+        """
+        self._pending_state[field] = value
+
+        if self._flush_handle is None:
+            self._flush_future = self.hass.loop.create_future()
+            self._flush_handle = self.hass.loop.call_later(
+                DEBOUNCE_WINDOW,
+                lambda: self.hass.async_create_task(self._async_flush_pending()),
+            )
+
+        return await asyncio.shield(self._flush_future)
+
+    async def _async_flush_pending(self) -> None:
+        """Push all queued state changes in a single write."""
+        pending, self._pending_state = self._pending_state, {}
+        future, self._flush_future = self._flush_future, None
+        self._flush_handle = None
+
+        try:
+            state = await self._client.set_states(**pending)
+        except Exception as err:  # pylint: disable=broad-except
+            if not future.done():
+                future.set_exception(err)
+            return
+
+        self.async_set_updated_data(state)
+        if not future.done():
+            future.set_result(state)
+
     async def _async_set_temperature(self, temperature: float) -> MiraModeState:
         """Set temperature on the device and refresh data."""
-        self.data = await self._client.set_temperature(temperature)
-        self.async_set_updated_data(self.data)
-        
-        return self.data
-        
+        return await self._async_set_value("temperature", temperature)
+
     async def _async_set_shower(self, shower: bool) -> MiraModeState:
         """Set shower state for device and refresh data."""
-        self.data = await self._client.set_shower(shower)
-        self.async_set_updated_data(self.data)
-        
-        return self.data
-        
+        return await self._async_set_value("shower", shower)
+
     async def _async_set_bath(self, bath: bool) -> MiraModeState:
-        """Set shower state for device and refresh data."""
-        self.data = await self._client.set_bath(bath)
-        self.async_set_updated_data(self.data)
-        
-        return self.data
+        """Set bath state for device and refresh data."""
+        return await self._async_set_value("bath", bath)
@@ -5,13 +5,11 @@ from __future__ import annotations
 import asyncio
 import dataclasses
 import struct
-from collections import namedtuple
-from datetime import datetime
+from binascii import crc_hqx
 import logging
 
 # from logging import Logger
-from math import exp
-from typing import Any, Callable, Tuple, TypeVar, cast
+from typing import Any, Callable, TypeVar, cast
 
 from bleak import BleakClient, BleakError
 from bleak.backends.device import BLEDevice
@@ -45,10 +43,35 @@ MIRA_COMMAND = "87050101"
 # Format - device_id + uuid_trigger_notif = 01|0700458A send to UUID_WRITE to trigger a notif on UUID_READ
 MIRA_TRIGGER_NOTIF = "0700458A"
 
+# Parse the hex constants once at import rather than on every BLE write
+_MIRA_COMMAND_BYTES = bytes.fromhex(MIRA_COMMAND)
+_MIRA_TRIGGER_NOTIF_BYTES = bytes.fromhex(MIRA_TRIGGER_NOTIF)
+
+# Compiled once so pack calls skip the format-string parse
+_U32BE = struct.Struct(">I")
+_U16BE = struct.Struct(">H")
+
+# temperature, two padding bytes, shower, bath - the packet tail from the
+# temperature field onwards, pulled out in a single unpack
+_STATE_FIELDS = struct.Struct(">B2xBB")
+
+# only 256 possible raw temperature bytes, so convert via lookup
+_TEMP_LUT = tuple(round((i + 268) / 10.4, 2) for i in range(256))
+
 _LOGGER = logging.getLogger(__name__)
 
 
-@dataclasses.dataclass
+def _crc16_ccitt(data: bytes, crc: int = 0xFFFF) -> int:
+    """Compute the CRC-16-CCITT (poly 0x1021, init 0xFFFF) of data.
+
+    Pass a previous return value as crc to continue across buffers.
+    """
+    # crc_hqx is the identical polynomial implemented in C in the stdlib
+    return crc_hqx(data, crc)
+
+
+# slots drops the per-instance __dict__ - these are allocated on every poll
+@dataclasses.dataclass(slots=True)
 class MiraModeState:
     """Response data with information about the MiraMode device"""
 
@@ -64,8 +87,7 @@ class MiraModeState:
 # pylint: disable=too-many-branches
 class MiraModeBluetoothAPI:
 
-    _event: asyncio.Event | None
-    _command_data: bytearray | None
+    _notify_future: asyncio.Future[bytearray] | None
 
     def __init__(
         self,
@@ -74,24 +96,26 @@ class MiraModeBluetoothAPI:
         address: str,
         client_id: int = 0, # only need to be set for control commands
         device_id: int = 0, # leave as optional for config flow so we can check connection to device before IDs are set
+        ble_device: BLEDevice | None = None, # pass the device from setup to skip a registry lookup
     ):
         super().__init__()
         self.logger = logger
         self.hass = hass
         
-        self._command_data = None
-        self._event = None
-        self._queue_lock = asyncio.Lock()
+        self._notify_future = None
         self._client_lock = asyncio.Lock()
         self._client: BleakClient | None = None
-        self._queued_users = 0
+        self._subscribed = False
+        self._read_char = MIRA_CHARACTERISTIC_UUID_READ
+        self._write_char = MIRA_CHARACTERISTIC_UUID_WRITE
 
         self.state = MiraModeState()
         self.state.address = address
         self.state.client_id = client_id
         self.state.device_id = device_id
         
-        ble_device = bluetooth.async_ble_device_from_address(self.hass, self.state.address)
+        if ble_device is None:
+            ble_device = bluetooth.async_ble_device_from_address(self.hass, self.state.address)
 
         if not ble_device:
             raise UpdateFailed(f"Could not find MiraMode device at {self.state.address}")
@@ -101,14 +125,21 @@ class MiraModeBluetoothAPI:
         else:
             self.state.name = ble_device.name
 
+        self._ble_device = ble_device
+
+        # Preassembled 10-byte command frame (device id + command + three
+        # value bytes + CRC); only the values and CRC change per push
+        self._cmd_buf = bytearray(10)
+        self._cmd_buf[0] = device_id
+        self._cmd_buf[1:5] = _MIRA_COMMAND_BYTES
+        self._client_id_be = _U32BE.pack(client_id)
+        self._trigger_payload = bytes([device_id]) + _MIRA_TRIGGER_NOTIF_BYTES
+
 
     def notification_handler(self, _: Any, data: bytearray) -> None:
         """Helper for command events"""
-        self._command_data = data
-
-        if self._event is None:
-            return
-        self._event.set()
+        if self._notify_future is not None and not self._notify_future.done():
+            self._notify_future.set_result(data)
 
     def disconnect_on_missing_services(func: WrapFuncType) -> WrapFuncType:
         """Define a wrapper to disconnect on missing services and characteristics.
@@ -123,7 +154,7 @@ class MiraModeBluetoothAPI:
             try:
                 return await func(self, *args, **kwargs)
             except (BleakServiceMissing, BleakCharacteristicMissing) as ex:
-                logger.warning(
+                _LOGGER.warning(
                     "%s: Missing service or characteristic, disconnecting to force refetch of GATT services: %s",
                     self.name,
                     ex,
@@ -135,56 +166,77 @@ class MiraModeBluetoothAPI:
 
         return cast(WrapFuncType, _async_disconnect_on_missing_services_wrap)
 
+    def _on_disconnect(self, client: BleakClient) -> None:
+        """Reset per-connection state when the link drops unexpectedly."""
+        self._subscribed = False
+
+    def set_ble_device(self, ble_device: BLEDevice) -> None:
+        """Refresh the cached device, e.g. from a new advertisement."""
+        self._ble_device = ble_device
+
     def _get_device(self) -> BLEDevice:
+        # the address never changes, so only hit the HA Bluetooth registry
+        # when the cached device has been invalidated by a connection failure
+        if self._ble_device is not None:
+            return self._ble_device
+
         ble_device = bluetooth.async_ble_device_from_address(self.hass, self.state.address)
 
         if not ble_device:
             raise UpdateFailed(f"Could not find MiraMode device at {self.state.address}")
-        
+
+        self._ble_device = ble_device
         return ble_device
 
+    async def _ensure_subscribed(self, client: BleakClient) -> None:
+        """Subscribe to state notifications once per connection."""
+        if self._subscribed:
+            return
+        await client.start_notify(
+            self._read_char, self.notification_handler
+        )
+        self._subscribed = True
+
     @disconnect_on_missing_services
     async def _get_state(self, client: BleakClient):
-        self._event = asyncio.Event()
-        try:
-            await client.start_notify(
-                MIRA_CHARACTERISTIC_UUID_READ, self.notification_handler
-            )
-        except:
-            self.logger.warn("_get_state Bleak error 1")
+        # a fresh single-shot future per read; resolved by notification_handler.
+        # the subscription is already in place from connect time.
+        self._notify_future = asyncio.get_running_loop().create_future()
 
-        await client.write_gatt_char(MIRA_CHARACTERISTIC_UUID_WRITE, bytes([self.state.device_id]) + bytes.fromhex(MIRA_TRIGGER_NOTIF))
+        await client.write_gatt_char(self._write_char, self._trigger_payload)
 
         # Wait for up to 5 seconds to see if a
         # callback comes in.
+        command_data = None
         try:
-            await asyncio.wait_for(self._event.wait(), 5)
+            command_data = await asyncio.wait_for(self._notify_future, 5)
         except asyncio.TimeoutError:
-            self.logger.warn("Timeout getting command data.")
+            _LOGGER.warning("Timeout getting command data.")
         except:
-            self.logger.warn("_get_state Bleak error 2")
-
-        await client.stop_notify(MIRA_CHARACTERISTIC_UUID_READ)
+            _LOGGER.warning("_get_state Bleak error 2")
+        finally:
+            self._notify_future = None
 
-        if self._command_data is None:
-            self.logger.warn("Command data is None")
+        if command_data is None:
+            _LOGGER.warning("Command data is None")
             raise BleakNoResponse("No response from device - is the Device ID correct?")
-        elif len(self._command_data) != 13 and len(self._command_data) != 14:
-            self.logger.warn("Unexpected data length %d", len(self._command_data))
+        elif len(command_data) != 13 and len(command_data) != 14:
+            _LOGGER.warning("Unexpected data length %d", len(command_data))
             raise BleakIncompatibleProduct("Packets of the wrong length are being received - is this a MiraMode device?")
         else:
-            # Missing first byte but still contains data so pad to length
-            if len(self._command_data) == 13:
-                b = bytearray(b'\x00')
-                self._command_data[0:0] = b
-            
-            self.state.temperature = round((self._command_data[6] + 268) / 10.4, 2)
-            self.state.shower = self._command_data[9] == 0x64
-            self.state.bath = self._command_data[10] == 0x64
-            self.logger.debug("Temperature: %s, Shower: %s, Bath: %s", self.state.temperature, self.state.shower, self.state.bath)
-            
-        self._command_data = None
-        
+            # 13-byte packets are just missing the leading byte; read the
+            # fields through an offset instead of copying into a padded buffer
+            offset = 1 if len(command_data) == 13 else 0
+
+            temp_b, shower_b, bath_b = _STATE_FIELDS.unpack_from(command_data, 6 - offset)
+            self.state.temperature = _TEMP_LUT[temp_b]
+            self.state.shower = shower_b == 0x64
+            self.state.bath = bath_b == 0x64
+            # guarded: this runs on every poll, so skip argument handling
+            # entirely when debug logging is off
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug("Temperature: %s, Shower: %s, Bath: %s", self.state.temperature, self.state.shower, self.state.bath)
+
         return self.state
     
     @disconnect_on_missing_services
@@ -194,63 +246,70 @@ class MiraModeBluetoothAPI:
         shower = 0x64 if self.state.shower else 0
         bath = 0x64 if self.state.bath else 0
         
-        # Create payload
-        payload = bytes([self.state.device_id]) + bytes.fromhex(MIRA_COMMAND) + bytes([temperature, shower, bath])
-
-        # Calculate CRC
-        data = payload + struct.pack(">I", self.state.client_id)
-
-        i = 0
-        i2 = 0xFFFF
-        while i < len(data):
-            b = data[i]
-            i3 = i2
-            for i2 in range(8):
-                i4 = 1
-                i5 = 1 if ((b >> (7 - i2)) & 1) == 1 else 0
-                if ((i3 >> 15) & 1) != 1:
-                    i4 = 0
-                i3 = i3 << 1
-                if (i5 ^ i4) != 0:
-                    i3 = i3 ^ 0x1021
-            i += 1
-            i2 = i3
-        crc = i2 & 0xFFFF
-
-        payload = payload + struct.pack(">H", crc)
-
-        await client.write_gatt_char(MIRA_CHARACTERISTIC_UUID_WRITE, payload)
+        # Fill the dynamic fields of the preassembled frame in place
+        buf = self._cmd_buf
+        buf[5] = temperature
+        buf[6] = shower
+        buf[7] = bath
+
+        # CRC covers the 8 payload bytes plus the client id suffix; chain
+        # the two buffers through the CRC rather than concatenating them
+        crc = _crc16_ccitt(self._client_id_be, _crc16_ccitt(memoryview(buf)[:8]))
+        _U16BE.pack_into(buf, 8, crc)
+
+        await client.write_gatt_char(self._write_char, buf)
         
         return self.state
 
+    async def _connected(self) -> BleakClient:
+        """Return a live client, reconnecting only when the link has dropped."""
+        if self._client is None or not self._client.is_connected:
+            self._subscribed = False
+            try:
+                ble_device = self._get_device()
+                self._client = await establish_connection(
+                    BleakClient, ble_device, ble_device.address,
+                    disconnected_callback=self._on_disconnect,
+                    use_services_cache=True)
+            except BleakError:
+                # the cached device may be stale - re-resolve once and retry
+                self._ble_device = None
+                ble_device = self._get_device()
+                self._client = await establish_connection(
+                    BleakClient, ble_device, ble_device.address,
+                    disconnected_callback=self._on_disconnect,
+                    use_services_cache=True)
+
+            # resolve the characteristics once per connection so each
+            # notify/write skips bleak's UUID-to-handle walk; fall back to
+            # the UUID strings if the services tree looks unexpected
+            services = self._client.services
+            self._read_char = services.get_characteristic(MIRA_CHARACTERISTIC_UUID_READ) or MIRA_CHARACTERISTIC_UUID_READ
+            self._write_char = services.get_characteristic(MIRA_CHARACTERISTIC_UUID_WRITE) or MIRA_CHARACTERISTIC_UUID_WRITE
+
+            # subscribe immediately so reads only cost the trigger write
+            await self._ensure_subscribed(self._client)
+
+        return self._client
+
     async def _with_client(self, func: Callable[[BleakClient], Any]) -> Any:
-        """Helper to wrap all BLE calls with shared connection handling."""
-        """Keeps track of threads waiting to acquire lock so knows whether to reuse connection or not."""
-        
-        # increment queued users
-        async with self._queue_lock:
-            self._queued_users += 1
-            
+        """Helper to wrap all BLE calls with shared connection handling.
+
+        The connection persists between calls - BLE connection setup dominates
+        command latency, so back-to-back commands reuse the same link.
+        """
         async with self._client_lock:
-            # decrement queued users
-            async with self._queue_lock:
-                self._queued_users -= 1
-                
-            # establish connection if needed
-            if self._client is None or not self._client.is_connected:
-                ble_device = self._get_device()
-                self._client = await establish_connection(BleakClient, ble_device, ble_device.address)
-            
-            # perform the operation
-            try:
-                return await func(self._client)
-            finally:
-                # release the connection if no one else is queuing
-                async with self._queue_lock:
-                    if self._queued_users == 0 and self._client:
-                        await self._client.disconnect()
-                        self._client = None
-                
+            client = await self._connected()
+            return await func(client)
+
+    async def async_close(self) -> None:
+        """Tear down the persistent connection (e.g. on config entry unload)."""
+        async with self._client_lock:
+            if self._client:
+                await self._client.disconnect()
+                self._client = None
+                self._subscribed = False
+
     async def update_state(self) -> MiraModeState:
         """Retrieve device state."""
         return await self._with_client(self._get_state)
@@ -259,35 +318,36 @@ class MiraModeBluetoothAPI:
         """Send device state."""
         return await self._with_client(self._push_state)
 
-    async def set_temperature(self, temperature: float) -> MiraModeState:
-        """Set the temperature."""
+    async def set_states(
+        self,
+        temperature: float | None = None,
+        shower: bool | None = None,
+        bath: bool | None = None,
+    ) -> MiraModeState:
+        """Apply any combination of state changes in a single device write."""
         async def _do(client: BleakClient):
+            # read first so the untouched fields in the payload are current,
+            # then trust the write - the coordinator re-polls anyway
             await self._get_state(client)
-            self.state.temperature = temperature
+            if temperature is not None:
+                self.state.temperature = temperature
+            if shower is not None:
+                self.state.shower = shower
+            if bath is not None:
+                self.state.bath = bath
             await self._push_state(client)
-            await self._get_state(client)
             return self.state
-        
+
         return await self._with_client(_do)
 
+    async def set_temperature(self, temperature: float) -> MiraModeState:
+        """Set the temperature."""
+        return await self.set_states(temperature=temperature)
+
     async def set_shower(self, shower: bool) -> MiraModeState:
         """Set shower mode."""
-        async def _do(client: BleakClient):
-            await self._get_state(client)
-            self.state.shower = shower
-            await self._push_state(client)
-            await self._get_state(client)
-            return self.state
-        
-        return await self._with_client(_do)
+        return await self.set_states(shower=shower)
 
     async def set_bath(self, bath: bool) -> MiraModeState:
         """Set bath mode."""
-        async def _do(client: BleakClient):
-            await self._get_state(client)
-            self.state.bath = bath
-            await self._push_state(client)
-            await self._get_state(client)
-            return self.state
-        
-        return await self._with_client(_do)
+        return await self.set_states(bath=bath)
@@ -14,27 +14,16 @@ SHOWER_COMMAND = "87050101"
 # Format - device_id + uuid_trigger_notif = 01|0700458A send to UUID_WRITE to trigger a notif on UUID_READ
 SHOWER_TRIGGER_NOTIF = "0700458A"
 
-# Use CRC-16-CCITT to validate payload, using the sniffed client id
+# Assembled once - these never change for a given device
+SHOWER_COMMAND_PREFIX = bytes([SHOWER_DEVICE_ID]) + bytes.fromhex(SHOWER_COMMAND)
+SHOWER_TRIGGER_PAYLOAD = bytes([SHOWER_DEVICE_ID]) + bytes.fromhex(SHOWER_TRIGGER_NOTIF)
+
+# Use CRC-16-CCITT to validate payload, using the sniffed client id.
+# binascii.crc_hqx is the same polynomial (0x1021) with the same 0xFFFF
+# init, implemented in C in the stdlib, so the whole loop is one call.
 def encode_crc(payload):
     data = payload + struct.pack(">I", SHOWER_CLIENT_ID)
-
-    i = 0
-    i2 = 0xFFFF
-    while i < len(data):
-        b = data[i]
-        i3 = i2
-        for i2 in range(8):
-            i4 = 1
-            i5 = 1 if ((b >> (7 - i2)) & 1) == 1 else 0
-            if ((i3 >> 15) & 1) != 1:
-                i4 = 0
-            i3 = i3 << 1
-            if (i5 ^ i4) != 0:
-                i3 = i3 ^ 0x1021
-        i += 1
-        i2 = i3
-    crc = i2 & 0xFFFF
-
+    crc = binascii.crc_hqx(data, 0xFFFF)
     return payload + struct.pack(">H", crc)
 
 _temperature = 40
@@ -45,17 +34,18 @@ def notification_handler(characteristic: BleakGATTCharacteristic, data: bytearra
     global _temperature, _bath, _shower
     print(f"Received message on {characteristic.uuid}: {binascii.hexlify(data)}")
     
-    # Missing first byte but still contains data so pad to length
+    # 13-byte packets are just missing the leading byte; index with an
+    # offset instead of splicing a pad byte into the buffer
     if len(data) == 13:
-        b = bytearray(b'\x00')
-        data[0:0] = b
-    
-    if len(data) != 14:
+        offset = 1
+    elif len(data) == 14:
+        offset = 0
+    else:
         raise Exception("Unexpected data length")
-            
-    _temperature = round((data[6] + 268) / 10.4, 2)
-    _shower = data[9] == 0x64
-    _bath = data[10] == 0x64
+
+    _temperature = round((data[6 - offset] + 268) / 10.4, 2)
+    _shower = data[9 - offset] == 0x64
+    _bath = data[10 - offset] == 0x64
     
     print(f"Temperature: {_temperature}, Shower: {_shower}, Bath: {_bath}")
 
@@ -76,7 +66,7 @@ async def main():
         
         # force a notification
         print("forcing notification")
-        await client.write_gatt_char(SHOWER_CHARACTERISTIC_UUID_WRITE, bytes([SHOWER_DEVICE_ID]) + bytes.fromhex(SHOWER_TRIGGER_NOTIF))
+        await client.write_gatt_char(SHOWER_CHARACTERISTIC_UUID_WRITE, SHOWER_TRIGGER_PAYLOAD)
         await asyncio.sleep(2.0)
         
         # toggle bath state and decrease temperature by 5 degrees
@@ -89,7 +79,7 @@ async def main():
         temperatureHex = int(max(0, min(255, round(_temperature * 10.4 - 268))))
         showerHex = 0x64 if _shower else 0
         bathHex = 0x64 if _bath else 0
-        payload = encode_crc(bytes([SHOWER_DEVICE_ID]) + bytes.fromhex(SHOWER_COMMAND) + bytes([temperatureHex, showerHex, bathHex]))
+        payload = encode_crc(SHOWER_COMMAND_PREFIX + bytes([temperatureHex, showerHex, bathHex]))
         await client.write_gatt_char(SHOWER_CHARACTERISTIC_UUID_WRITE, payload)
         await asyncio.sleep(2.0)
         